@@ -1,3 +1,5 @@
+from itertools import chain
+
 import numpy as np
 import pyvrp as pyvrp
 
@@ -59,17 +61,29 @@ def instance2data(instance: TensorDict, scaling_factor: int) -> ProblemData:
         y=coords[0][1],
     )
 
+    # Convert client columns to native Python ints once, rather than indexing
+    # (and boxing NumPy scalars) per client
+    xs, ys = coords[1:].T.tolist()
+    tw_earlies, tw_lates = time_windows[1:].T.tolist()
     clients = [
         Client(
-            x=coords[idx][0],
-            y=coords[idx][1],
-            tw_early=time_windows[idx][0],
-            tw_late=time_windows[idx][1],
-            delivery=delivery[idx],
-            pickup=pickup[idx],
-            service_duration=service[idx],
+            x=x,
+            y=y,
+            tw_early=tw_early,
+            tw_late=tw_late,
+            delivery=demand,
+            pickup=backhaul_demand,
+            service_duration=service_duration,
+        )
+        for x, y, tw_early, tw_late, demand, backhaul_demand, service_duration in zip(
+            xs,
+            ys,
+            tw_earlies,
+            tw_lates,
+            delivery[1:].tolist(),
+            pickup[1:].tolist(),
+            service[1:].tolist(),
         )
-        for idx in range(1, num_locs)
     ]
 
     vehicle_type = VehicleType(
@@ -106,4 +120,4 @@ def solution2action(solution: pyvrp.Solution) -> list[int]:
     """
     Converts a PyVRP solution to the action representation, i.e., a giant tour.
     """
-    return [visit for route in solution.routes() for visit in route.visits() + [0]]
+    return list(chain.from_iterable((*route.visits(), 0) for route in solution.routes()))
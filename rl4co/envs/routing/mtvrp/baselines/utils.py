@@ -4,6 +4,15 @@ import torch
 from tensordict import TensorDict
 from torch import Tensor
 
+try:
+    import numba as nb
+except ImportError:
+    nb = None
+
+INT32_MAX = np.iinfo(np.int32).max
+# Matrices larger than this are scaled with the JIT-compiled kernel (if numba is available)
+NUMBA_SCALE_MIN_SIZE = 50_000
+
 
 def process_instance(td: TensorDict) -> TensorDict:
     """
@@ -26,11 +35,35 @@ def scale(data: Tensor, scaling_factor: int):
     """
     Scales ands rounds data to integers so PyVRP can handle it.
     """
-    array = (data * scaling_factor).numpy().round()
-    array = np.where(array == np.inf, np.iinfo(np.int32).max, array)
-    array = array.astype(int)
+    if nb is not None and data.ndim == 2 and data.numel() > NUMBA_SCALE_MIN_SIZE:
+        return _scale_matrix(data.numpy(), scaling_factor)
+
+    # Single float64 buffer, updated in place: scale, round and clip infinities
+    array = data.numpy().astype(np.float64)
+    np.multiply(array, scaling_factor, out=array)
+    np.rint(array, out=array)
+    np.minimum(array, INT32_MAX, out=array)
+    array = array.astype(np.int64, copy=False)
 
     if array.size == 1:
         return array.item()
 
     return array
+
+
+if nb is not None:
+
+    @nb.njit(nogil=True, cache=True)
+    def _scale_matrix(array: np.ndarray, scaling_factor: int) -> np.ndarray:
+        """
+        Same as `scale` for large matrices, fused into a single pass.
+        Note: single-threaded, since `solve` already runs it in a pool of processes, and
+        no `fastmath`, since it would assume there are no infinities.
+        """
+        out = np.empty(array.shape, dtype=np.int64)
+        for i in range(array.shape[0]):
+            for j in range(array.shape[1]):
+                out[i, j] = min(
+                    np.rint(np.float64(array[i, j]) * scaling_factor), INT32_MAX
+                )
+        return out
@@ -1,6 +1,6 @@
 import torch
 
-from einops import einsum, reduce
+from einops import einsum
 from tensordict import TensorDict
 from torch._tensor import Tensor
 
@@ -104,17 +104,25 @@ class JSSPEnv(FJSPEnv):
                 td["job_in_process"].any(1, keepdims=True) & (~td["done"])
             ) | td["done"]
         # reduce action mask to correspond with logit shape
-        action_mask = reduce(action_mask, "bs j m -> bs j", reduction="all")
+        action_mask = action_mask.all(dim=-1)
         # NOTE: 1 means feasible action, 0 means infeasible action
-        # (bs, 1 + n_j)
-        mask = torch.cat((no_op_mask, ~action_mask), dim=1)
+        # (bs, 1 + n_j); written in place to avoid the temporaries of negation and concat.
+        # The mask is allocated per step, since it is stored in the (cloned) td of each step
+        mask = torch.empty(
+            (action_mask.size(0), 1 + action_mask.size(1)),
+            dtype=torch.bool,
+            device=action_mask.device,
+        )
+        mask[:, :1] = no_op_mask
+        torch.logical_not(action_mask, out=mask[:, 1:])
         return mask
 
     def _translate_action(self, td):
         job = td["action"]
         op = gather_by_index(td["next_op"], job, dim=1)
-        # get the machine that corresponds to the selected operation
-        ma = gather_by_index(td["ops_ma_adj"], op.unsqueeze(1), dim=2).nonzero()[:, 1]
+        # get the machine that corresponds to the selected operation. Since every operation has
+        # exactly one eligible machine in the JSSP, argmax finds it without the host sync of nonzero
+        ma = gather_by_index(td["ops_ma_adj"], op.unsqueeze(1), dim=2).argmax(dim=1)
         return job, op, ma
 
     @staticmethod
@@ -428,8 +428,8 @@ class MultiHeadCompat(nn.Module):
         self.val_dim = val_dim
         self.key_dim = key_dim
 
-        self.W_query = nn.Parameter(torch.Tensor(n_heads, input_dim, key_dim))
-        self.W_key = nn.Parameter(torch.Tensor(n_heads, input_dim, key_dim))
+        self.W_query = nn.Parameter(torch.empty(n_heads, input_dim, key_dim))
+        self.W_key = nn.Parameter(torch.empty(n_heads, input_dim, key_dim))
 
         self.init_parameters()
 
@@ -437,7 +437,7 @@ class MultiHeadCompat(nn.Module):
     def init_parameters(self):
         for param in self.parameters():
             stdv = 1.0 / math.sqrt(param.size(-1))
-            param.data.uniform_(-stdv, stdv)
+            nn.init.uniform_(param, -stdv, stdv)
 
     def forward(self, q, h=None, mask=None):
         """
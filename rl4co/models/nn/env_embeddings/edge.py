@@ -91,8 +91,8 @@ class TSPEdgeEmbedding(nn.Module):
                 )
             else:
                 edge_index = get_full_graph_edge_index(
-                    cost_matrix.shape[0], self_loop=False
-                ).to(cost_matrix.device)
+                    cost_matrix.shape[0], self_loop=False, device=cost_matrix.device
+                )
                 edge_attr = cost_matrix[edge_index[0], edge_index[1]]
 
             graph = Data(
@@ -138,7 +138,7 @@ class NoEdgeEmbedding(nn.Module):
         data_list = []
         n = init_embeddings.shape[1]
         device = init_embeddings.device
-        edge_index = get_full_graph_edge_index(n, self_loop=self.self_loop).to(device)
+        edge_index = get_full_graph_edge_index(n, self_loop=self.self_loop, device=device)
         m = edge_index.shape[1]
 
         for node_embed in init_embeddings:
@@ -1,5 +1,7 @@
+from functools import lru_cache
 from typing import Callable, Tuple
 
+import torch
 import torch.nn as nn
 import torch.nn.functional as F
 
@@ -8,10 +10,12 @@ from torch import Tensor
 
 try:
     from torch_geometric.nn import GCNConv
+    from torch_geometric.nn.conv.gcn_conv import gcn_norm
+    from torch_geometric.utils import remove_self_loops, to_torch_csr_tensor
 except ImportError:
     GCNConv = None
 from rl4co.models.nn.env_embeddings import env_init_embedding
-from rl4co.utils.ops import get_full_graph_edge_index
+from rl4co.utils.ops import batch_edge_index, get_full_graph_edge_index
 from rl4co.utils.pylogger import get_pylogger
 
 log = get_pylogger(__name__)
@@ -21,8 +25,60 @@ EdgeIndexFnSignature = Callable[[TensorDict, int], Tensor]
 
 
 def edge_idx_fn_wrapper(td: TensorDict, num_nodes: int):
-    # self-loop is added by GCNConv layer
-    return get_full_graph_edge_index(num_nodes, self_loop=False).to(td.device)
+    # self-loop is added by the GCN normalization
+    edge_index = get_full_graph_edge_index(num_nodes, self_loop=False, device=td.device)
+    # all graphs of the batch share the same topology
+    return batch_edge_index(edge_index, td.batch_size.numel(), num_nodes)
+
+
+def gcn_adjacency(edge_index: Tensor, num_nodes: int, dtype: torch.dtype) -> Tensor:
+    """Normalized adjacency D^-1/2 (A + I) D^-1/2 of a graph as a transposed CSR tensor,
+    so that message passing in the GCN layers runs as a sparse-dense matmul
+    """
+    # Self-loops are added by the normalization, hence we remove existing ones to avoid duplicates
+    edge_index, _ = remove_self_loops(edge_index)
+    edge_weight = torch.ones(edge_index.size(1), dtype=dtype, device=edge_index.device)
+    adj_t = to_torch_csr_tensor(
+        edge_index.flip(0), edge_weight, size=(num_nodes, num_nodes)
+    )
+    adj_t, _ = gcn_norm(adj_t, add_self_loops=True)
+    return adj_t
+
+
+@lru_cache(8)
+def get_full_graph_gcn_adjacency(num_nodes: int, device: torch.device) -> Tensor:
+    """Dense normalized adjacency of a fully connected graph, shape (num_nodes, num_nodes),
+    shared by all graphs of a batch. It only depends on the graph size, hence it is cached
+    (note: built in float32 and outside inference mode, since the cached tensor may later
+    be used with autograd or autocast). Not used under torch.compile, since dynamo cannot
+    trace the sparse CSR tensor it is built from
+    """
+    with torch.inference_mode(False):
+        edge_index = get_full_graph_edge_index(num_nodes, self_loop=False, device=device)
+        return gcn_adjacency(edge_index, num_nodes, torch.float32).to_dense()
+
+
+def dense_gcn_conv(layer: GCNConv, x: Tensor, adj: Tensor) -> Tensor:
+    """Applies a (non-normalizing) GCN layer to the features `x` of shape
+    (batch_size * num_nodes, embed_dim), with the dense adjacency `adj` of shape
+    (num_nodes, num_nodes) shared by all graphs of the batch
+    """
+    num_nodes = adj.size(0)
+    x = layer.lin(x).view(-1, num_nodes, layer.out_channels)
+    out = torch.matmul(adj.to(x.dtype), x).view(-1, layer.out_channels)
+    if layer.bias is not None:
+        out = out + layer.bias
+    return out
+
+
+def csr_spmm_supported(x: Tensor) -> bool:
+    """Whether the features `x` can be aggregated with a sparse CSR matmul, which is not
+    implemented for half precision (e.g. under autocast) on CPU
+    """
+    if x.device.type != "cpu":
+        return True
+    low_precision = x.dtype not in (torch.float32, torch.float64)
+    return not (low_precision or torch.is_autocast_enabled("cpu"))
 
 
 class GCNEncoder(nn.Module):
@@ -67,11 +123,37 @@ class GCNEncoder(nn.Module):
 
         self.edge_idx_fn = edge_idx_fn
 
-        # Define the GCN layers
+        # Define the GCN layers. The adjacency is normalized once in the forward pass (as a
+        # CSR adjacency, or as edge weights under torch.compile) and shared by all layers,
+        # hence the layers do not normalize it themselves
         self.gcn_layers = nn.ModuleList(
-            [GCNConv(embed_dim, embed_dim, bias=bias) for _ in range(num_layers)]
+            [
+                GCNConv(embed_dim, embed_dim, bias=bias, normalize=False)
+                for _ in range(num_layers)
+            ]
         )
 
+    def _get_edge_index(
+        self, td: TensorDict, num_nodes: int, mask: Tensor | None = None
+    ) -> Tensor:
+        # shape=(2, num_edges)
+        edge_index = self.edge_idx_fn(td, num_nodes)
+        if mask is not None:
+            # Filter the edge indices, rather than materializing a masked adjacency
+            src, dst = edge_index
+            keep = mask[dst // num_nodes, dst % num_nodes, src % num_nodes]
+            edge_index = edge_index[:, keep]
+        return edge_index
+
+    @staticmethod
+    def _gcn_conv(
+        layer: GCNConv, x: Tensor, adj: Tensor, edge_weight: Tensor | None = None
+    ) -> Tensor:
+        if adj.layout == torch.strided and adj.is_floating_point():
+            # dense adjacency shared by all graphs of the batch
+            return dense_gcn_conv(layer, x, adj)
+        return layer(x, adj, edge_weight)
+
     def forward(
         self, td: TensorDict, mask: Tensor | None = None
     ) -> Tuple[Tensor, Tensor]:
@@ -80,7 +162,8 @@ class GCNEncoder(nn.Module):
 
         Args:
             td: Input TensorDict containing the environment state
-            mask: Mask to apply to the attention
+            mask: [batch_size, num_nodes, num_nodes] boolean mask of the edges, where
+                `mask[b, i, j] = False` removes the message from node j to node i
 
         Returns:
             h: Latent representation of the input
@@ -91,18 +174,44 @@ class GCNEncoder(nn.Module):
         bs, num_nodes, emb_dim = init_h.shape
         # (bs*num_nodes, emb_dim)
         update_node_feature = init_h.reshape(-1, emb_dim)
-        # shape=(2, num_edges)
-        edge_index = self.edge_idx_fn(td, num_nodes)
+        # Normalized adjacency (or normalized edge weights), computed once and shared by
+        # all layers
+        edge_weight = None
+        if (
+            self.edge_idx_fn is edge_idx_fn_wrapper
+            and mask is None
+            and not torch.compiler.is_compiling()
+        ):
+            # The fully connected graph only depends on its size: reuse the cached one
+            adj = get_full_graph_gcn_adjacency(num_nodes, init_h.device)
+        elif torch.compiler.is_compiling() or not csr_spmm_supported(init_h):
+            # Dynamo cannot trace the sparse CSR adjacency (nor can the CSR matmul run in
+            # low precision on CPU): pass the normalization to the layers as edge weights
+            # of the plain edge indices instead
+            edge_index = self._get_edge_index(td, num_nodes, mask)
+            adj, edge_weight = gcn_norm(
+                edge_index,
+                num_nodes=bs * num_nodes,
+                add_self_loops=True,
+                dtype=init_h.dtype,
+            )
+        else:
+            edge_index = self._get_edge_index(td, num_nodes, mask)
+            adj = gcn_adjacency(edge_index, bs * num_nodes, init_h.dtype)
 
         for layer in self.gcn_layers[:-1]:
-            update_node_feature = layer(update_node_feature, edge_index)
+            update_node_feature = self._gcn_conv(
+                layer, update_node_feature, adj, edge_weight
+            )
             update_node_feature = F.relu(update_node_feature)
             update_node_feature = F.dropout(
                 update_node_feature, training=self.training, p=self.dropout
             )
 
         # last layer without relu activation and dropout
-        update_node_feature = self.gcn_layers[-1](update_node_feature, edge_index)
+        update_node_feature = self._gcn_conv(
+            self.gcn_layers[-1], update_node_feature, adj, edge_weight
+        )
 
         # De-batch the graph
         update_node_feature = update_node_feature.view(bs, num_nodes, emb_dim)
@@ -30,35 +30,33 @@ class DAC_ATT(nn.Module):
 
         # W_h^Q in the paper
         self.W_query_node = nn.Parameter(
-            torch.Tensor(n_heads, self.input_dim, self.key_dim)
+            torch.empty(n_heads, self.input_dim, self.key_dim)
         )
         # W_g^Q in the paper
         self.W_query_pos = nn.Parameter(
-            torch.Tensor(n_heads, self.input_dim, self.key_dim)
+            torch.empty(n_heads, self.input_dim, self.key_dim)
         )
         # W_h^K in the paper
-        self.W_key_node = nn.Parameter(
-            torch.Tensor(n_heads, self.input_dim, self.key_dim)
-        )
+        self.W_key_node = nn.Parameter(torch.empty(n_heads, self.input_dim, self.key_dim))
         # W_g^K in the paper
-        self.W_key_pos = nn.Parameter(torch.Tensor(n_heads, self.input_dim, self.key_dim))
+        self.W_key_pos = nn.Parameter(torch.empty(n_heads, self.input_dim, self.key_dim))
 
         # W_h^V and W_h^Vref in the paper
         self.W_val_node = nn.Parameter(
-            torch.Tensor(2 * n_heads, self.input_dim, self.val_dim)
+            torch.empty(2 * n_heads, self.input_dim, self.val_dim)
         )
         # W_g^V and W_g^Vref in the paper
         self.W_val_pos = nn.Parameter(
-            torch.Tensor(2 * n_heads, self.input_dim, self.val_dim)
+            torch.empty(2 * n_heads, self.input_dim, self.val_dim)
         )
 
         # W_h^O and W_g^O in the paper
         if embed_dim is not None:
             self.W_out_node = nn.Parameter(
-                torch.Tensor(n_heads, 2 * self.key_dim, embed_dim)
+                torch.empty(n_heads, 2 * self.key_dim, embed_dim)
             )
             self.W_out_pos = nn.Parameter(
-                torch.Tensor(n_heads, 2 * self.key_dim, embed_dim)
+                torch.empty(n_heads, 2 * self.key_dim, embed_dim)
             )
 
         self.init_parameters()
@@ -66,7 +64,7 @@ class DAC_ATT(nn.Module):
     def init_parameters(self):
         for param in self.parameters():
             stdv = 1.0 / math.sqrt(param.size(-1))
-            param.data.uniform_(-stdv, stdv)
+            nn.init.uniform_(param, -stdv, stdv)
 
     def forward(self, h_node_in, h_pos_in):  # input (NFEs, PFEs)
         # h,g should be (batch_size, graph_size, input_dim)
@@ -26,29 +26,29 @@ class HeterogenousMHA(nn.Module):
 
         self.norm_factor = 1 / math.sqrt(key_dim)  # See Attention is all you need
 
-        self.W_query = nn.Parameter(torch.Tensor(num_heads, input_dim, key_dim))
-        self.W_key = nn.Parameter(torch.Tensor(num_heads, input_dim, key_dim))
-        self.W_val = nn.Parameter(torch.Tensor(num_heads, input_dim, val_dim))
+        self.W_query = nn.Parameter(torch.empty(num_heads, input_dim, key_dim))
+        self.W_key = nn.Parameter(torch.empty(num_heads, input_dim, key_dim))
+        self.W_val = nn.Parameter(torch.empty(num_heads, input_dim, val_dim))
 
         # Pickup weights
-        self.W1_query = nn.Parameter(torch.Tensor(num_heads, input_dim, key_dim))
-        self.W2_query = nn.Parameter(torch.Tensor(num_heads, input_dim, key_dim))
-        self.W3_query = nn.Parameter(torch.Tensor(num_heads, input_dim, key_dim))
+        self.W1_query = nn.Parameter(torch.empty(num_heads, input_dim, key_dim))
+        self.W2_query = nn.Parameter(torch.empty(num_heads, input_dim, key_dim))
+        self.W3_query = nn.Parameter(torch.empty(num_heads, input_dim, key_dim))
 
         # Delivery weights
-        self.W4_query = nn.Parameter(torch.Tensor(num_heads, input_dim, key_dim))
-        self.W5_query = nn.Parameter(torch.Tensor(num_heads, input_dim, key_dim))
-        self.W6_query = nn.Parameter(torch.Tensor(num_heads, input_dim, key_dim))
+        self.W4_query = nn.Parameter(torch.empty(num_heads, input_dim, key_dim))
+        self.W5_query = nn.Parameter(torch.empty(num_heads, input_dim, key_dim))
+        self.W6_query = nn.Parameter(torch.empty(num_heads, input_dim, key_dim))
 
         if embed_dim is not None:
-            self.W_out = nn.Parameter(torch.Tensor(num_heads, key_dim, embed_dim))
+            self.W_out = nn.Parameter(torch.empty(num_heads, key_dim, embed_dim))
 
         self.init_parameters()
 
     def init_parameters(self):
         for param in self.parameters():
             stdv = 1.0 / math.sqrt(param.size(-1))
-            param.data.uniform_(-stdv, stdv)
+            nn.init.uniform_(param, -stdv, stdv)
 
     def forward(self, q, h=None, mask=None):
         """
@@ -3,8 +3,6 @@ from typing import Optional
 import torch
 import torch.nn as nn
 
-from torch.distributions import Categorical
-
 from rl4co.models.common.constructive.autoregressive import (
     AutoregressiveDecoder,
     AutoregressiveEncoder,
@@ -16,7 +14,7 @@ from rl4co.models.nn.graph.hgnn import HetGNNEncoder
 from rl4co.models.nn.mlp import MLP
 from rl4co.models.zoo.matnet.matnet_w_sa import Encoder
 from rl4co.utils.decoding import DecodingStrategy, process_logits
-from rl4co.utils.ops import gather_by_index
+from rl4co.utils.ops import calculate_log_likelihood_and_entropy, gather_by_index
 from rl4co.utils.pylogger import get_pylogger
 
 from .decoder import L2DAttnActor, L2DDecoder
@@ -42,6 +40,7 @@ class L2DPolicy(AutoregressivePolicy):
         train_decode_type: str = "sampling",
         val_decode_type: str = "greedy",
         test_decode_type: str = "multistart_sampling",
+        compile_decoder: bool = False,
         **constructive_policy_kw,
     ):
         if len(constructive_policy_kw) > 0:
@@ -81,6 +80,14 @@ class L2DPolicy(AutoregressivePolicy):
                 normalization=normalization,
             )
 
+        if compile_decoder:
+            # The actor runs many small ops at every decoding step; compile it in place
+            # (keeping the state dict keys) to fuse kernels and, on GPU, capture them in CUDA
+            # graphs. Shapes are fixed within an episode, so we specialize on them.
+            # NOTE: the (stepwise) feature extractor is not compiled, since the number of
+            # edges of the GCN graph changes at every step and would trigger recompilations
+            decoder.actor.compile(mode="reduce-overhead", dynamic=False)
+
         # Pass to constructive policy
         super(L2DPolicy, self).__init__(
             encoder=encoder,
@@ -220,8 +227,9 @@ class L2DPolicy4PPO(L2DPolicy):
         logits, mask = self.decoder.actor(td, *hidden)
         # get logprobs and entropy over logp distribution
         logprobs = process_logits(logits, mask, tanh_clipping=self.tanh_clipping)
-        action_logprobs = gather_by_index(logprobs, td["action"], dim=1)
-        dist_entropys = Categorical(logprobs.exp()).entropy()
+        action_logprobs, dist_entropys = calculate_log_likelihood_and_entropy(
+            logprobs, td["action"]
+        )
 
         return action_logprobs, value_pred, dist_entropys
 
@@ -46,10 +46,9 @@ class MDAMDecoder(nn.Module):
         self.val_decode_type = val_decode_type
         self.test_decode_type = test_decode_type
 
-        self.W_placeholder = nn.Parameter(torch.Tensor(2 * embed_dim))
-        self.W_placeholder.data.uniform_(
-            -1, 1
-        )  # Placeholder should be in range of activations
+        self.W_placeholder = nn.Parameter(torch.empty(2 * embed_dim))
+        # Placeholder should be in range of activations
+        nn.init.uniform_(self.W_placeholder, -1, 1)
 
         self.context = nn.ModuleList(
             [
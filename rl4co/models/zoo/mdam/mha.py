@@ -21,10 +21,10 @@ class MultiHeadAttentionMDAM(nn.Module):
 
         self.norm_factor = 1 / math.sqrt(embed_dim)  # See Attention is all you need
 
-        self.W_query = nn.Parameter(torch.Tensor(n_heads, embed_dim, embed_dim))
-        self.W_key = nn.Parameter(torch.Tensor(n_heads, embed_dim, embed_dim))
-        self.W_val = nn.Parameter(torch.Tensor(n_heads, embed_dim, embed_dim))
-        self.W_out = nn.Parameter(torch.Tensor(n_heads, embed_dim, embed_dim))
+        self.W_query = nn.Parameter(torch.empty(n_heads, embed_dim, embed_dim))
+        self.W_key = nn.Parameter(torch.empty(n_heads, embed_dim, embed_dim))
+        self.W_val = nn.Parameter(torch.empty(n_heads, embed_dim, embed_dim))
+        self.W_out = nn.Parameter(torch.empty(n_heads, embed_dim, embed_dim))
 
         self.init_parameters()
         self.last_one = last_one
@@ -32,7 +32,7 @@ class MultiHeadAttentionMDAM(nn.Module):
     def init_parameters(self):
         for param in self.parameters():
             stdv = 1.0 / math.sqrt(param.size(-1))
-            param.data.uniform_(-stdv, stdv)
+            nn.init.uniform_(param, -stdv, stdv)
 
     def forward(self, q, h=None, mask=None):
         if h is None:
@@ -39,10 +39,10 @@ class NodePairRemovalDecoder(ImprovementDecoder):
         assert embed_dim % num_heads == 0
 
         self.W_Q = nn.Parameter(
-            torch.Tensor(self.n_heads, self.input_dim, self.hidden_dim)
+            torch.empty(self.n_heads, self.input_dim, self.hidden_dim)
         )
         self.W_K = nn.Parameter(
-            torch.Tensor(self.n_heads, self.input_dim, self.hidden_dim)
+            torch.empty(self.n_heads, self.input_dim, self.hidden_dim)
         )
 
         self.agg = MLP(input_dim=2 * self.n_heads + 4, output_dim=1, num_neurons=[32, 32])
@@ -52,7 +52,7 @@ class NodePairRemovalDecoder(ImprovementDecoder):
     def init_parameters(self) -> None:
         for param in self.parameters():
             stdv = 1.0 / math.sqrt(param.size(-1))
-            param.data.uniform_(-stdv, stdv)
+            nn.init.uniform_(param, -stdv, stdv)
 
     def forward(self, td: TensorDict, final_h: Tensor, final_p: Tensor) -> Tensor:
         """Compute the logits of the removing a node pair from the current solution
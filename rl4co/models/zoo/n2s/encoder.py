@@ -26,9 +26,9 @@ class Synth_Attention(nn.Module):
         self.input_dim = input_dim
         self.hidden_dim = hidden_dim
 
-        self.W_query = nn.Parameter(torch.Tensor(n_heads, input_dim, hidden_dim))
-        self.W_key = nn.Parameter(torch.Tensor(n_heads, input_dim, hidden_dim))
-        self.W_val = nn.Parameter(torch.Tensor(n_heads, input_dim, hidden_dim))
+        self.W_query = nn.Parameter(torch.empty(n_heads, input_dim, hidden_dim))
+        self.W_key = nn.Parameter(torch.empty(n_heads, input_dim, hidden_dim))
+        self.W_val = nn.Parameter(torch.empty(n_heads, input_dim, hidden_dim))
 
         self.score_aggr = nn.Sequential(
             nn.Linear(2 * n_heads, 2 * n_heads),
@@ -36,7 +36,7 @@ class Synth_Attention(nn.Module):
             nn.Linear(2 * n_heads, n_heads),
         )
 
-        self.W_out = nn.Parameter(torch.Tensor(n_heads, hidden_dim, input_dim))
+        self.W_out = nn.Parameter(torch.empty(n_heads, hidden_dim, input_dim))
 
         self.init_parameters()
 
@@ -44,7 +44,7 @@ class Synth_Attention(nn.Module):
     def init_parameters(self):
         for param in self.parameters():
             stdv = 1.0 / math.sqrt(param.size(-1))
-            param.data.uniform_(-stdv, stdv)
+            nn.init.uniform_(param, -stdv, stdv)
 
     def forward(
         self, h_fea: torch.Tensor, aux_att_score: torch.Tensor
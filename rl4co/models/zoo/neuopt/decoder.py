@@ -37,8 +37,8 @@ class RDSDecoder(ImprovementDecoder):
         self.linear_Q3 = nn.Linear(self.embed_dim, self.embed_dim, bias=False)
         self.linear_Q4 = nn.Linear(self.embed_dim, self.embed_dim, bias=False)
 
-        self.linear_V1 = nn.Parameter(torch.Tensor(self.embed_dim))
-        self.linear_V2 = nn.Parameter(torch.Tensor(self.embed_dim))
+        self.linear_V1 = nn.Parameter(torch.empty(self.embed_dim))
+        self.linear_V2 = nn.Parameter(torch.empty(self.embed_dim))
 
         self.rnn1 = nn.GRUCell(self.embed_dim, self.embed_dim)
         self.rnn2 = nn.GRUCell(self.embed_dim, self.embed_dim)
@@ -106,14 +106,14 @@ class NeuOptPolicy(ImprovementPolicy):
         self.decoder = RDSDecoder(embed_dim=embed_dim)
 
         self.init_hidden_W = nn.Linear(self.embed_dim, self.embed_dim)
-        self.init_query_learnable = nn.Parameter(torch.Tensor(self.embed_dim))
+        self.init_query_learnable = nn.Parameter(torch.empty(self.embed_dim))
 
         self.init_parameters()
 
     def init_parameters(self) -> None:
         for param in self.parameters():
             stdv = 1.0 / math.sqrt(param.size(-1))
-            param.data.uniform_(-stdv, stdv)
+            nn.init.uniform_(param, -stdv, stdv)
 
     def forward(
         self,
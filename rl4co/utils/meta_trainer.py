@@ -1,8 +1,6 @@
 import lightning.pytorch as pl
 import torch
 import math
-import copy
-from torch.optim import Adam
 
 from lightning import Callback
 from rl4co import utils
@@ -10,6 +8,22 @@ import random
 log = utils.get_pylogger(__name__)
 
 
+def _clone_state_dict(state_dict: dict) -> dict:
+    """Snapshot of a state dict, copying tensors directly instead of deep-copying the object graph"""
+    return {k: v.detach().clone() for k, v in state_dict.items()}
+
+
+def _flatten_state_dict(state_dict: dict, out: torch.Tensor = None) -> torch.Tensor:
+    """Flatten (a snapshot of) a state dict into a single contiguous float vector, optionally written into `out`"""
+    return torch.cat([v.detach().reshape(-1).float() for v in state_dict.values()], out=out)
+
+
+def _unflatten_state_dict(vector: torch.Tensor, state_dict: dict) -> dict:
+    """Inverse of `_flatten_state_dict`, following the keys and shapes of `state_dict`"""
+    chunks = vector.split([v.numel() for v in state_dict.values()])
+    return {k: chunk.view_as(v) for (k, v), chunk in zip(state_dict.items(), chunks)}
+
+
 class ReptileCallback(Callback):
 
     """ Meta training framework for addressing the generalization issue (implement the Reptile algorithm only)
@@ -69,19 +83,30 @@ class ReptileCallback(Callback):
 
         # Reinitialize the task model with the parameters of the meta model
         if trainer.current_epoch %  self.num_tasks == 0: # Save the meta model
-            self.meta_model_state_dict = copy.deepcopy(pl_module.state_dict())
-            self.task_models = []
+            live_state_dict = pl_module.state_dict()
+            self.meta_model_state_dict = _clone_state_dict(live_state_dict)
+            # Tensors of the state dict share the storage of the live parameters and buffers,
+            # such that the task model can be reset to the meta model by copying into them
+            self._live_tensors = list(live_state_dict.values())
+            self._meta_tensors = list(self.meta_model_state_dict.values())
+            self.meta_model_vector = _flatten_state_dict(self.meta_model_state_dict)
+            # Flattened task models, one row per task of the meta-training iteration
+            self.task_models = self.meta_model_vector.new_empty(self.num_tasks, self.meta_model_vector.numel())
             # Print sampled tasks
             if self.print_log:
                 print('\n>> Meta epoch: {} (Exact epoch: {}), Training task: {}'.format(trainer.current_epoch//self.num_tasks, trainer.current_epoch, self.selected_tasks))
         else:
-            pl_module.load_state_dict(self.meta_model_state_dict)
+            # Fused multi-tensor copy, instead of the per-tensor checks and copies of `load_state_dict`
+            with torch.no_grad():
+                torch._foreach_copy_(self._live_tensors, self._meta_tensors)
 
-        # Reinitialize the optimizer every epoch
+        # Reset the optimizer every epoch: each epoch is the inner loop of a new task starting from the meta model,
+        # so the optimizer state is cleared and only the learning rate is updated in place
         lr_decay = 0.1 if trainer.current_epoch+1 == int(self.sch_bar * trainer.max_epochs) else 1
-        old_lr  = trainer.optimizers[0].param_groups[0]['lr']
-        new_optimizer = Adam(pl_module.parameters(), lr=old_lr * lr_decay)
-        trainer.optimizers = [new_optimizer]
+        optimizer = trainer.optimizers[0]
+        optimizer.state.clear()
+        for param_group in optimizer.param_groups:
+            param_group['lr'] = param_group['lr'] * lr_decay
 
         # Print
         if self.print_log:
@@ -93,15 +118,13 @@ class ReptileCallback(Callback):
     def on_train_epoch_end(self,  trainer: pl.Trainer, pl_module: pl.LightningModule):
 
         # Save the task model
-        self.task_models.append(copy.deepcopy(pl_module.state_dict()))
+        _flatten_state_dict(pl_module.state_dict(), out=self.task_models[trainer.current_epoch % self.num_tasks])
         if (trainer.current_epoch+1) % self.num_tasks == 0:
             # Outer-loop optimization (update the meta model with the parameters of the task model)
             with torch.no_grad():
-                state_dict = {params_key: (self.meta_model_state_dict[params_key] +
-                                           self.alpha * torch.mean(torch.stack([fast_weight[params_key] - self.meta_model_state_dict[params_key]
-                                                                                for fast_weight in self.task_models], dim=0).float(), dim=0))
-                              for params_key in self.meta_model_state_dict}
-                pl_module.load_state_dict(state_dict)
+                # meta + alpha * mean(fast_weight - meta), over the contiguous (num_tasks, num_params) matrix
+                meta_vector = torch.lerp(self.meta_model_vector, self.task_models.mean(dim=0), self.alpha)
+                pl_module.load_state_dict(_unflatten_state_dict(meta_vector, self.meta_model_state_dict))
 
         # Get ready for the next meta-training iteration
         if (trainer.current_epoch + 1) % self.num_tasks == 0:
@@ -113,11 +136,8 @@ class ReptileCallback(Callback):
 
     def _sample_task(self):
 
-        # Sample a batch of tasks
-        self.selected_tasks = []
-        for b in range(self.num_tasks):
-            task_params = random.sample(self.task_set, 1)[0]
-            self.selected_tasks.append(task_params)
+        # Sample a batch of tasks (uniformly, with replacement)
+        self.selected_tasks = random.choices(self.task_set, k=self.num_tasks)
 
     def _load_task(self, pl_module: pl.LightningModule, task_idx=0):
 
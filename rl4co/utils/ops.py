@@ -107,13 +107,28 @@ def calculate_entropy(logprobs: Tensor):
     """Calculate the entropy of the log probabilities distribution
     logprobs: Tensor of shape [batch, decoder_steps, num_actions]
     """
+    # note: sanitizing the logprobs (-inf -> finite) keeps the gradients of masked actions at zero,
+    # which is why we do not use `torch.special.entr(logprobs.exp())` (NaN gradients for p = 0)
     logprobs = torch.nan_to_num(logprobs, nan=0.0)
-    entropy = -(logprobs.exp() * logprobs).sum(dim=-1)  # [batch, decoder steps]
-    entropy = entropy.sum(dim=1)  # [batch] -- sum over decoding steps
+    # [batch] -- single reduction over actions and decoding steps
+    entropy = -(logprobs.exp() * logprobs).sum(dim=(1, 2))
     assert entropy.isfinite().all(), "Entropy is not finite"
     return entropy
 
 
+def calculate_log_likelihood_and_entropy(logprobs: Tensor, actions: Tensor):
+    """Calculate the log likelihood of the selected actions and the entropy of the log probabilities
+    distribution per decoding step, directly from the log probabilities (i.e. without building a
+    distribution object which normalizes and takes the log of the probabilities again)
+    logprobs: Tensor of shape [..., num_actions]
+    actions: Tensor of shape [...]
+    """
+    log_likelihood = logprobs.gather(-1, actions.unsqueeze(-1)).squeeze(-1)
+    logprobs = torch.nan_to_num(logprobs, nan=0.0)
+    entropy = -(logprobs.exp() * logprobs).sum(dim=-1)
+    return log_likelihood, entropy
+
+
 # TODO: modularize inside the envs
 def get_num_starts(td, env_name=None):
     """Returns the number of possible start nodes for the environment based on the action mask"""
@@ -205,15 +220,32 @@ def sparsify_graph(cost_matrix: Tensor, k_sparse: Optional[int] = None, self_loo
     return edge_index, edge_attr
 
 
-@lru_cache(5)
-def get_full_graph_edge_index(num_node: int, self_loop=False) -> Tensor:
-    adj_matrix = torch.ones(num_node, num_node)
-    if not self_loop:
-        adj_matrix.fill_diagonal_(0)
-    edge_index = torch.permute(torch.nonzero(adj_matrix), (1, 0))
+@lru_cache(8)
+def get_full_graph_edge_index(num_node: int, self_loop=False, device="cpu") -> Tensor:
+    # cached per device, so callers must not modify the returned tensor in place.
+    # Built outside inference mode, since the cached tensor may later be used with autograd
+    with torch.inference_mode(False):
+        adj_matrix = torch.ones(num_node, num_node, device=device)
+        if not self_loop:
+            adj_matrix.fill_diagonal_(0)
+        edge_index = torch.permute(torch.nonzero(adj_matrix), (1, 0))
     return edge_index
 
 
+def batch_edge_index(edge_index: Tensor, batch_size: int, num_nodes: int) -> Tensor:
+    """replicates the edge indices of a single graph over a batch of graphs sharing the
+    same topology, offsetting the node indices of each graph (in the "flat graph" format
+    required by the pytorch geometric module).
+
+    :param Tensor edge_index: shape=(2, num_edges)
+    :return Tensor: shape=(2, batch_size * num_edges)
+    """
+    offset = torch.arange(batch_size, device=edge_index.device) * num_nodes
+    # (2, batch_size, num_edges)
+    batched_edge_index = edge_index[:, None] + offset[None, :, None]
+    return batched_edge_index.reshape(2, -1)
+
+
 def adj_to_pyg_edge_index(adj: Tensor) -> Tensor:
     """transforms an adjacency matrix (boolean) to a Tensor with the respective edge
     indices (in the format required by the pytorch geometric module).
@@ -1,6 +1,16 @@
+import sys
+
 import pytest
+import torch
 
-from rl4co.models import AttentionModelPolicy, N2SPolicy, PointerNetworkPolicy
+from rl4co.envs import JSSPEnv
+from rl4co.models import (
+    AttentionModelPolicy,
+    L2DPolicy,
+    L2DPolicy4PPO,
+    N2SPolicy,
+    PointerNetworkPolicy,
+)
 from rl4co.utils.ops import select_start_nodes
 from rl4co.utils.test_utils import generate_env_data
 
@@ -86,3 +96,23 @@ def test_N2S(size=20, batch_size=2):
     policy = N2SPolicy(env_name=env.name)
     out = policy(td, env, decode_type="greedy")
     assert out["cost_bsf"].shape == (batch_size,)
+
+
+@pytest.mark.skipif(
+    "torch_geometric" not in sys.modules, reason="PyTorch Geometric not installed"
+)
+@pytest.mark.parametrize("policy_cls", [L2DPolicy, L2DPolicy4PPO])
+def test_l2d_compile_decoder(policy_cls, batch_size=2):
+    env = JSSPEnv(generator_params=dict(num_jobs=4, num_machines=3))
+    td = env.reset(batch_size=[batch_size])
+    policy = policy_cls(env_name=env.name, het_emb=False).eval()
+    policy_compiled = policy_cls(env_name=env.name, het_emb=False, compile_decoder=True)
+    policy_compiled.eval()
+    # compiling in place keeps the state dict keys
+    assert policy_compiled.state_dict().keys() == policy.state_dict().keys()
+    policy_compiled.load_state_dict(policy.state_dict())
+    with torch.no_grad():
+        out = policy(td.clone(), env, phase="val", return_entropy=True)
+        out_compiled = policy_compiled(td.clone(), env, phase="val", return_entropy=True)
+    assert torch.equal(out["reward"], out_compiled["reward"])
+    assert torch.allclose(out["entropy"], out_compiled["entropy"], atol=1e-5)
@@ -1,12 +1,31 @@
+import sys
+
+import numpy as np
 import pytest
 import torch
 
 from tensordict import TensorDict
-from torch.nn.functional import scaled_dot_product_attention
+from torch.distributions import Categorical
+from torch.nn.functional import relu, scaled_dot_product_attention
 
+from rl4co.envs import TSPEnv
+from rl4co.envs.routing.mtvrp.baselines import utils as baseline_utils
 from rl4co.models.nn.attention import scaled_dot_product_attention_simple
+from rl4co.models.nn.graph.gcn import (
+    GCNEncoder,
+    gcn_adjacency,
+    get_full_graph_gcn_adjacency,
+)
 from rl4co.utils.decoding import process_logits
-from rl4co.utils.ops import batchify, unbatchify
+from rl4co.utils.ops import (
+    adj_to_pyg_edge_index,
+    batch_edge_index,
+    batchify,
+    calculate_log_likelihood_and_entropy,
+    gather_by_index,
+    get_full_graph_edge_index,
+    unbatchify,
+)
 
 
 @pytest.mark.parametrize(
@@ -50,3 +69,197 @@ def test_scaled_dot_product_attention():
     attn_torch = scaled_dot_product_attention(q, k, v, attn_mask)
     attn_rl4co = scaled_dot_product_attention_simple(q, k, v, attn_mask)
     assert torch.allclose(attn_torch, attn_rl4co)
+
+
+def test_calculate_log_likelihood_and_entropy(batch_size=4, num_steps=3, num_actions=6):
+    logits = torch.randn(batch_size, num_steps, num_actions)
+    mask = torch.rand(batch_size, num_steps, num_actions) < 0.7
+    mask[..., 0] = True  # at least one feasible action
+    logits = logits.masked_fill(~mask, float("-inf")).requires_grad_()
+    logprobs = logits.log_softmax(dim=-1)
+    actions = Categorical(logprobs.exp()).sample()
+    log_likelihood, entropy = calculate_log_likelihood_and_entropy(logprobs, actions)
+    log_likelihood_ref = gather_by_index(logprobs, actions, dim=-1)
+    entropy_ref = Categorical(logprobs.exp()).entropy()
+    assert torch.allclose(log_likelihood, log_likelihood_ref)
+    assert torch.allclose(entropy, entropy_ref, atol=1e-6)
+    (log_likelihood.sum() + entropy.sum()).backward()
+    assert logits.grad.isfinite().all()
+
+
+@pytest.mark.parametrize("self_loop", [True, False])
+def test_batch_edge_index(self_loop):
+    bs, n = 3, 5
+    edge_index = get_full_graph_edge_index(n, self_loop=self_loop)
+    adj = torch.ones(bs, n, n)
+    if not self_loop:
+        adj[:, torch.arange(n), torch.arange(n)] = 0
+    assert torch.equal(batch_edge_index(edge_index, bs, n), adj_to_pyg_edge_index(adj))
+
+
+@pytest.fixture
+def highest_matmul_precision():
+    # training tests lower the global float32 matmul precision (see RL4COTrainer)
+    precision = torch.get_float32_matmul_precision()
+    torch.set_float32_matmul_precision("highest")
+    yield
+    torch.set_float32_matmul_precision(precision)
+
+
+def full_graph_edge_idx_fn(td, num_nodes):
+    return adj_to_pyg_edge_index(torch.ones(td.batch_size[0], num_nodes, num_nodes))
+
+
+@pytest.mark.skipif(
+    "torch_geometric" not in sys.modules, reason="PyTorch Geometric not installed"
+)
+@pytest.mark.usefixtures("highest_matmul_precision")
+@pytest.mark.parametrize("edge_idx_fn", [None, full_graph_edge_idx_fn])
+def test_gcn_encoder_compile(edge_idx_fn, batch_size=3, num_loc=10):
+    td = TSPEnv(generator_params=dict(num_loc=num_loc)).reset(batch_size=[batch_size])
+    encoder = GCNEncoder("tsp", embed_dim=16, num_layers=2, edge_idx_fn=edge_idx_fn)
+    encoder.eval()
+    h, _ = encoder(td)
+    h_compiled, _ = torch.compile(encoder)(td)
+    assert torch.allclose(h, h_compiled, atol=1e-6)
+
+
+@pytest.mark.skipif(
+    "torch_geometric" not in sys.modules, reason="PyTorch Geometric not installed"
+)
+@pytest.mark.parametrize("dtype", [torch.bfloat16, torch.float16])
+@pytest.mark.parametrize("edge_idx_fn", [None, full_graph_edge_idx_fn])
+def test_gcn_encoder_autocast(edge_idx_fn, dtype, batch_size=3, num_loc=10):
+    td = TSPEnv(generator_params=dict(num_loc=num_loc)).reset(batch_size=[batch_size])
+    encoder = GCNEncoder("tsp", embed_dim=16, num_layers=2, edge_idx_fn=edge_idx_fn)
+    with torch.autocast("cpu", dtype=dtype):
+        h, _ = encoder(td)
+    h.float().sum().backward()
+    assert h.shape == (batch_size, num_loc, 16)
+    assert all(param.grad.isfinite().all() for param in encoder.gcn_layers.parameters())
+
+
+def gcn_encoder_reference(encoder, td, edge_index):
+    from torch_geometric.nn import GCNConv
+
+    # GCN layers normalizing the adjacency themselves, as in the original implementation
+    init_h = encoder.init_embedding(td)
+    bs, num_nodes, embed_dim = init_h.shape
+    h = init_h.reshape(-1, embed_dim)
+    for i, layer in enumerate(encoder.gcn_layers):
+        ref_layer = GCNConv(embed_dim, embed_dim)
+        ref_layer.load_state_dict(layer.state_dict())
+        h = ref_layer(h, edge_index)
+        if i < len(encoder.gcn_layers) - 1:
+            h = relu(h)
+    return h.view(bs, num_nodes, embed_dim) + init_h
+
+
+@pytest.mark.skipif(
+    "torch_geometric" not in sys.modules, reason="PyTorch Geometric not installed"
+)
+@pytest.mark.usefixtures("highest_matmul_precision")
+@pytest.mark.parametrize("compiling", [False, True])
+@pytest.mark.parametrize("edge_idx_fn", [None, full_graph_edge_idx_fn])
+def test_gcn_encoder_normalization(edge_idx_fn, compiling, monkeypatch):
+    td = TSPEnv(generator_params=dict(num_loc=10)).reset(batch_size=[3])
+    encoder = GCNEncoder("tsp", embed_dim=16, num_layers=2, edge_idx_fn=edge_idx_fn)
+    encoder.eval()
+    # the edge weights path taken under torch.compile also runs in eager mode
+    monkeypatch.setattr(torch.compiler, "is_compiling", lambda: compiling)
+    h, _ = encoder(td)
+    h_ref = gcn_encoder_reference(encoder, td, full_graph_edge_idx_fn(td, 10))
+    assert torch.allclose(h, h_ref, atol=1e-6)
+
+
+@pytest.mark.skipif(
+    "torch_geometric" not in sys.modules, reason="PyTorch Geometric not installed"
+)
+def test_full_graph_gcn_adjacency(batch_size=3, num_nodes=5):
+    adj = get_full_graph_gcn_adjacency(num_nodes, "cpu")
+    assert adj.dtype == torch.float32
+    # the graphs of the batch share the adjacency of a single graph
+    edge_index = batch_edge_index(
+        get_full_graph_edge_index(num_nodes), batch_size, num_nodes
+    )
+    adj_t_ref = gcn_adjacency(edge_index, batch_size * num_nodes, torch.float32)
+    assert torch.allclose(torch.block_diag(*[adj] * batch_size), adj_t_ref.to_dense())
+
+
+@pytest.mark.skipif(
+    "torch_geometric" not in sys.modules, reason="PyTorch Geometric not installed"
+)
+def test_full_graph_gcn_adjacency_cached_in_inference_mode():
+    td = TSPEnv(generator_params=dict(num_loc=7)).reset(batch_size=[3])
+    encoder = GCNEncoder("tsp", embed_dim=16, num_layers=2)
+    # e.g. validation populates the cache before training uses the same graph size
+    get_full_graph_gcn_adjacency.cache_clear()
+    with torch.inference_mode():
+        encoder(td)
+    h, _ = encoder(td)
+    h.sum().backward()
+    assert all(param.grad.isfinite().all() for param in encoder.gcn_layers.parameters())
+
+
+def gcn_encoder_dense_reference(encoder, td, adj):
+    # adj[b, i, j] = 1 if node i receives a message from node j
+    init_h = encoder.init_embedding(td)
+    num_nodes = adj.size(-1)
+    adj = adj.float() + torch.eye(num_nodes)
+    deg_inv_sqrt = adj.sum(-1).pow(-0.5)
+    adj = deg_inv_sqrt[..., :, None] * adj * deg_inv_sqrt[..., None, :]
+    h = init_h
+    for i, layer in enumerate(encoder.gcn_layers):
+        h = adj @ layer.lin(h) + layer.bias
+        if i < len(encoder.gcn_layers) - 1:
+            h = relu(h)
+    return h + init_h
+
+
+@pytest.mark.skipif(
+    "torch_geometric" not in sys.modules, reason="PyTorch Geometric not installed"
+)
+@pytest.mark.usefixtures("highest_matmul_precision")
+@pytest.mark.parametrize("full_graph", [True, False])
+def test_gcn_encoder_mask(full_graph, batch_size=3, num_loc=10):
+    td = TSPEnv(generator_params=dict(num_loc=num_loc)).reset(batch_size=[batch_size])
+    if full_graph:
+        adj = torch.ones(batch_size, num_loc, num_loc, dtype=torch.bool)
+        edge_idx_fn = None
+    else:
+        # directed graph: adj[b, i, j] is the edge from node i to node j
+        adj = torch.rand(batch_size, num_loc, num_loc) < 0.5
+
+        def edge_idx_fn(td, num_nodes):
+            return adj_to_pyg_edge_index(adj)
+
+    adj = adj & ~torch.eye(num_loc, dtype=torch.bool)
+    mask = torch.rand(batch_size, num_loc, num_loc) < 0.7
+    encoder = GCNEncoder("tsp", embed_dim=16, num_layers=2, edge_idx_fn=edge_idx_fn)
+    encoder.eval()
+    h, _ = encoder(td, mask=mask)
+    h_ref = gcn_encoder_dense_reference(encoder, td, adj.transpose(1, 2) & mask)
+    assert torch.allclose(h, h_ref, atol=1e-6)
+
+
+def test_scale():
+    assert baseline_utils.scale(torch.tensor(2.5), 10) == 25
+    # the product is rounded in float64: float32(0.0125) is slightly above 0.0125
+    scaled = baseline_utils.scale(torch.tensor([0.0125, 1.5, 0.25]), 1000)
+    assert np.array_equal(scaled, [13, 1500, 250])
+    # infinities are clipped to the largest int32
+    scaled = baseline_utils.scale(torch.tensor([[0.0, float("inf")], [1.0, 0.5]]), 1000)
+    assert np.array_equal(scaled, [[0, 2**31 - 1], [1000, 500]])
+
+
+def test_scale_matrix_numba(monkeypatch):
+    pytest.importorskip("numba")
+    data = torch.rand(300, 300) * 10
+    data[0, 1] = data[5, :3] = float("inf")
+    assert data.numel() > baseline_utils.NUMBA_SCALE_MIN_SIZE
+    scaled = baseline_utils._scale_matrix(data.numpy(), 1000)
+    # NumPy path of `scale`
+    monkeypatch.setattr(baseline_utils, "nb", None)
+    scaled_ref = baseline_utils.scale(data, 1000)
+    assert scaled.dtype == scaled_ref.dtype
+    assert np.array_equal(scaled, scaled_ref)